@@ -0,0 +1,123 @@
+"""Настройка логирования для сервиса логов."""
+
+import atexit
+import logging
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+LOG_DIR = Path(__file__).resolve().parent / "logs"
+LOG_FILE = LOG_DIR / "app.log"
+
+MAX_LOG_SIZE = 10 * 1024 * 1024  # 10 МБ
+BACKUP_COUNT = 5
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+class AsyncRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler с ротацией бэкапов в фоновом потоке.
+
+    Стандартный doRollover переносит всю цепочку .1 → .2 → … на потоке,
+    записавшем «переполнившую» запись, и блокирует логирование на сотни
+    миллисекунд. Здесь синхронно выполняется только дешёвое переименование
+    активного файла, после чего запись сразу возобновляется, а перестройку
+    цепочки бэкапов выполняет выделенный поток.
+    """
+
+    _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-rollover")
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if self.backupCount > 0:
+            tmp_name = self.baseFilename + ".rotating"
+            if os.path.exists(self.baseFilename):
+                os.replace(self.baseFilename, tmp_name)
+            self._executor.submit(self._rotate_backups, tmp_name)
+        if not self.delay:
+            self.stream = self._open()
+
+    def _rotate_backups(self, tmp_name: str) -> None:
+        for i in range(self.backupCount - 1, 0, -1):
+            sfn = self.rotation_filename("%s.%d" % (self.baseFilename, i))
+            dfn = self.rotation_filename("%s.%d" % (self.baseFilename, i + 1))
+            if os.path.exists(sfn):
+                if os.path.exists(dfn):
+                    os.remove(dfn)
+                os.replace(sfn, dfn)
+        dfn = self.rotation_filename(self.baseFilename + ".1")
+        if os.path.exists(dfn):
+            os.remove(dfn)
+        if os.path.exists(tmp_name):
+            os.replace(tmp_name, dfn)
+
+
+file_handler: RotatingFileHandler | None = None
+_listener: QueueListener | None = None
+
+
+def setup_logging() -> None:
+    """Инициализирует обработчики логирования для всего сервиса.
+
+    Записи складываются в очередь, а запись в файл и консоль выполняет
+    фоновый QueueListener: вызовы logger.* не блокируются на syscall'ах
+    записи и порождают на порядки меньше обращений к диску при всплесках.
+    """
+    global file_handler, _listener
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    file_handler = AsyncRotatingFileHandler(
+        LOG_FILE,
+        maxBytes=MAX_LOG_SIZE,
+        backupCount=BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(formatter)
+    file_handler.setLevel(logging.INFO)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(logging.INFO)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    _listener = QueueListener(
+        log_queue,
+        file_handler,
+        console_handler,
+        respect_handler_level=True,
+    )
+    _listener.start()
+    # Дренировать очередь при завершении процесса.
+    atexit.register(_listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(QueueHandler(log_queue))
+
+
+def reopen_file_handler() -> None:
+    """Перепривязывает файловый обработчик к текущему файлу логов.
+
+    После переименования app.log открытый дескриптор продолжает писать в
+    старый inode; закрытие и повторное открытие потока переключает запись
+    на новый пустой файл.
+    """
+    if file_handler is None:
+        return
+    file_handler.acquire()
+    try:
+        file_handler.close()
+        file_handler.stream = file_handler._open()
+    finally:
+        file_handler.release()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Возвращает логгер с указанным именем."""
+    return logging.getLogger(name)
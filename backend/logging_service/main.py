@@ -0,0 +1,151 @@
+"""Сервис просмотра и управления логами приложения."""
+
+import asyncio
+import os
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse
+
+from logger import LOG_FILE, get_logger, reopen_file_handler, setup_logging
+from schemas import ClearLogsResponse, HealthResponse, LogResponse
+
+setup_logging()
+logger = get_logger(__name__)
+
+app = FastAPI(
+    title="Logging Service",
+    description="Сервис просмотра и управления логами приложения",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
+
+# Размер блока при обратном чтении хвоста файла.
+TAIL_CHUNK_SIZE = 64 * 1024
+
+
+def _tail(path: Path, lines: int) -> tuple[bytes, int]:
+    """Читает хвост файла, покрывающий последние `lines` строк.
+
+    Читается только хвост файла, поэтому стоимость пропорциональна числу
+    запрошенных строк, а не размеру файла. Возвращает сырые байты и
+    оценку общего числа строк по прочитанному хвосту — без полного скана.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= lines:
+            step = min(TAIL_CHUNK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+    return buf, buf.count(b"\n")
+
+
+def _atomic_clear(path: Path, backup: Path) -> None:
+    """Переименовывает лог в резервную копию и создаёт пустой файл.
+
+    os.replace — операция O(1) над inode, без чтения содержимого в память.
+    """
+    try:
+        os.replace(path, backup)
+    except FileNotFoundError:
+        pass
+    open(path, "w").close()
+
+
+@app.get("/logs", response_model=LogResponse)
+async def get_logs(
+    request: Request,
+    lines: int = Query(100, ge=1, le=10000),
+):
+    """Возвращает последние N строк файла логов.
+
+    Ответ снабжается ETag по mtime+размеру файла: пока лог не менялся,
+    опрашивающие клиенты получают 304 без чтения файла.
+    """
+    try:
+        try:
+            st = LOG_FILE.stat()
+        except FileNotFoundError:
+            return ORJSONResponse(
+                {"logs": [], "total_lines": 0, "returned_lines": 0}
+            )
+
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}-{lines}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304)
+
+        raw, total_lines = await asyncio.to_thread(_tail, LOG_FILE, lines)
+
+        log_entries = [
+            line.decode("utf-8", "replace") for line in raw.split(b"\n") if line
+        ][-lines:]
+
+        logger.info("Получено %d строк логов", len(log_entries))
+
+        # Данные сгенерированы сервером: сериализуем напрямую через orjson,
+        # минуя Pydantic-валидацию ответа.
+        return ORJSONResponse(
+            {
+                "logs": log_entries,
+                "total_lines": total_lines,
+                "returned_lines": len(log_entries),
+            },
+            headers={"ETag": etag, "Cache-Control": "no-cache"},
+        )
+    except Exception as e:
+        logger.error("Ошибка при чтении логов: %s", e)
+        raise HTTPException(status_code=500, detail="Не удалось прочитать файл логов")
+
+
+@app.post("/logs/clear", response_model=ClearLogsResponse)
+async def clear_logs():
+    """Очищает файл логов, предварительно сохраняя резервную копию."""
+    try:
+        backup_file = LOG_FILE.with_name(
+            f"app_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log.bak"
+        )
+
+        await asyncio.to_thread(_atomic_clear, LOG_FILE, backup_file)
+        reopen_file_handler()
+
+        logger.info("Логи очищены, резервная копия: %s", backup_file.name)
+
+        return ClearLogsResponse(
+            message="Логи очищены",
+            backup_file=backup_file.name,
+        )
+    except Exception as e:
+        logger.error("Ошибка при очистке логов: %s", e)
+        raise HTTPException(status_code=500, detail="Не удалось очистить файл логов")
+
+
+@app.get("/logs/download")
+async def download_logs():
+    """Отдаёт файл логов целиком.
+
+    Передача идёт через FileResponse: под uvicorn Starlette использует
+    os.sendfile, так что содержимое не копируется через Python. Готовый
+    stat_result избавляет Starlette от повторного stat-вызова.
+    """
+    try:
+        stat_result = os.stat(LOG_FILE)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Файл логов не найден")
+
+    return FileResponse(
+        LOG_FILE,
+        media_type="text/plain",
+        filename="app.log",
+        stat_result=stat_result,
+    )
+
+
+@app.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Проверка работоспособности сервиса."""
+    return HealthResponse(status="ok", service="logging_service")
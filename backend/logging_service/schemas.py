@@ -0,0 +1,31 @@
+"""Pydantic-схемы ответов сервиса логов."""
+
+from pydantic import BaseModel, ConfigDict
+
+
+class LogResponse(BaseModel):
+    """Последние строки лога."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    logs: list[str]
+    total_lines: int
+    returned_lines: int
+
+
+class ClearLogsResponse(BaseModel):
+    """Результат очистки файла логов."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    message: str
+    backup_file: str
+
+
+class HealthResponse(BaseModel):
+    """Статус сервиса."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    status: str
+    service: str
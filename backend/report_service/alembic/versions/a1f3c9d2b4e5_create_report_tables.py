@@ -0,0 +1,79 @@
+"""Create report tables
+
+Revision ID: a1f3c9d2b4e5
+Revises:
+Create Date: 2024-05-20 11:42:17.309214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "a1f3c9d2b4e5"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Тип создаётся явно в upgrade(); create_type=False не даёт SQLAlchemy
+# создавать его повторно при эмиссии CREATE TABLE, поэтому миграция
+# переживает повторный запуск.
+report_type = postgresql.ENUM("pdf", "xlsx", name="reporttype", create_type=False)
+
+
+def upgrade() -> None:
+    # Миграция выполняется в одной транзакции; ослабляем fsync и даём
+    # больше памяти на построение индексов — быстрее холодный старт.
+    op.execute("SET LOCAL synchronous_commit = off")
+    op.execute("SET LOCAL maintenance_work_mem = '256MB'")
+
+    report_type.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "report_templates",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("type", report_type, nullable=False),
+        sa.Column("template_path", sa.String(length=512), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name", "type", name="uq_rt_name_type"),
+    )
+    op.create_table(
+        "report_history",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("file_name", sa.String(length=255), nullable=False),
+        sa.Column("file_path", sa.String(length=512), nullable=False),
+        sa.Column("type", report_type, nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=True),
+        sa.Column(
+            "parameters", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("expired_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Те же индексы, что в models.ReportHistory.__table_args__: листание
+    # истории по (type, created_at DESC) и поиск просроченных отчётов.
+    op.create_index(
+        "ix_rh_type_created",
+        "report_history",
+        ["type", sa.text("created_at DESC")],
+    )
+    op.create_index("ix_rh_expired", "report_history", ["expired_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("report_history")
+    op.drop_table("report_templates")
+    report_type.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,536 @@
+"""Сервис генерации отчётов по прогнозу спроса."""
+
+import asyncio
+import logging
+import os
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from async_lru import alru_cache
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Query, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
+from sqlalchemy import bindparam, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_session_maker, engine, get_db
+from models import Base, ReportHistory, ReportTemplate, ReportType
+from report_generator import (
+    REPORT_POOL,
+    gather_report_inputs,
+    generate_pdf_report,
+    generate_xlsx_report,
+)
+from templating import get_compiled_template
+from schemas import (
+    ReportGenerateResponse,
+    ReportHistoryResponse,
+    ReportMetricsResponse,
+    ReportRequest,
+    ReportTemplateCreate,
+    ReportTemplateResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(
+    title="Report Service",
+    description="Сервис генерации отчётов по прогнозу спроса",
+    version="1.0.0",
+)
+
+# Явный список источников: Starlette сравнивает Origin по множеству и
+# отдаёт статические заголовки, а wildcard вместе с credentials ещё и
+# нарушает спецификацию CORS.
+cors_origins = os.environ.get("CORS_ORIGINS", "http://localhost:3000").split(",")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=cors_origins,
+    allow_credentials=True,
+    allow_methods=["GET", "POST"],
+    allow_headers=["*"],
+)
+
+REPORTS_DIR = Path(__file__).resolve().parent / "reports"
+# Строковый путь для горячих обработчиков — без аллокации Path на запрос.
+REPORTS_DIR_STR = str(REPORTS_DIR)
+
+# Время жизни сгенерированного отчёта.
+REPORT_TTL = timedelta(hours=1)
+
+# Повторяющиеся запросы собраны один раз на уровне модуля: SQLAlchemy
+# переиспользует скомпилированный SQL, параметры подставляются при вызове.
+_TEMPLATE_STMT = (
+    select(ReportTemplate)
+    .where(ReportTemplate.name == bindparam("name"))
+    .where(ReportTemplate.type == bindparam("type"))
+)
+# Списки отдаются колоночной проекцией: строки приходят кортежами, без
+# гидратации ORM-объектов и identity map.
+_HISTORY_COLS = (
+    ReportHistory.id,
+    ReportHistory.file_name,
+    ReportHistory.type,
+    ReportHistory.size_bytes,
+    ReportHistory.created_at,
+    ReportHistory.expired_at,
+)
+_TEMPLATE_COLS = (
+    ReportTemplate.id,
+    ReportTemplate.name,
+    ReportTemplate.type,
+    ReportTemplate.template_path,
+    ReportTemplate.description,
+    ReportTemplate.created_at,
+)
+_HISTORY_STMT = select(*_HISTORY_COLS).order_by(ReportHistory.created_at.desc())
+_TEMPLATE_LIST_STMT = select(*_TEMPLATE_COLS).order_by(ReportTemplate.name)
+
+DEFAULT_TEMPLATES = (
+    ("default", ReportType.PDF, "templates/default_report.html", "Стандартный PDF-отчёт"),
+    ("default", ReportType.XLSX, "templates/default_report.json", "Стандартный XLSX-отчёт"),
+)
+
+
+# Период опроса фоновой очистки просроченных отчётов.
+SWEEP_INTERVAL_SECONDS = 60
+
+
+@app.on_event("startup")
+async def startup_event():
+    REPORTS_DIR.mkdir(exist_ok=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await create_default_templates()
+    await _prime_pdf_templates()
+    app.state.expiry_sweeper = asyncio.create_task(_expiry_sweeper())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    sweeper = getattr(app.state, "expiry_sweeper", None)
+    if sweeper is not None:
+        sweeper.cancel()
+    REPORT_POOL.shutdown(wait=False, cancel_futures=True)
+
+
+async def _expiry_sweeper():
+    """Единственная фоновая задача, удаляющая просроченные отчёты.
+
+    Одна спящая корутина вместо задачи на каждый сгенерированный отчёт:
+    нагрузка на планировщик event loop не растёт с частотой генерации.
+    """
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+        try:
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    select(ReportHistory.id, ReportHistory.file_path).where(
+                        ReportHistory.expired_at < datetime.now(timezone.utc)
+                    )
+                )
+                expired_reports = result.all()
+            if expired_reports:
+                await cleanup_expired_report_files(
+                    [r.id for r in expired_reports],
+                    [r.file_path for r in expired_reports],
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Ошибка фоновой очистки отчётов")
+
+
+async def _prime_pdf_templates():
+    """Прогревает кэш скомпилированных PDF-шаблонов при старте."""
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(ReportTemplate.template_path).where(
+                ReportTemplate.type == ReportType.PDF
+            )
+        )
+        for template_path in result.scalars():
+            get_compiled_template(template_path)
+
+
+async def create_default_templates():
+    """Создаёт стандартные шаблоны отчётов, если их ещё нет."""
+    async with async_session_maker() as db:
+        for name, report_type, template_path, description in DEFAULT_TEMPLATES:
+            existing_id = await db.scalar(
+                select(ReportTemplate.id)
+                .where(ReportTemplate.name == name)
+                .where(ReportTemplate.type == report_type)
+                .limit(1)
+            )
+            if existing_id is None:
+                db.add(
+                    ReportTemplate(
+                        name=name,
+                        type=report_type,
+                        template_path=template_path,
+                        description=description,
+                    )
+                )
+        await db.commit()
+
+
+@alru_cache(maxsize=128, ttl=300)
+async def _get_template(name: str, report_type: ReportType) -> Optional[tuple[int, str]]:
+    """Возвращает (id, template_path) шаблона или None.
+
+    Шаблоны меняются редко — результат кэшируется, и повторные генерации
+    отчётов не ходят за шаблоном в БД. Кэш сбрасывается при создании
+    нового шаблона.
+    """
+    async with async_session_maker() as db:
+        result = await db.execute(_TEMPLATE_STMT, {"name": name, "type": report_type})
+        template = result.scalars().first()
+        if template is None:
+            return None
+        return template.id, template.template_path
+
+
+async def _gather_report_data(request: ReportRequest, context: dict) -> None:
+    """Наполняет контекст данными прогноза и истории.
+
+    Параллельная выборка живёт рядом с самими запросами в
+    report_generator.gather_report_inputs; сюда передаётся фабрика
+    сессий, т.к. каждой выборке нужна собственная сессия.
+    """
+    context.update(
+        await gather_report_inputs(
+            async_session_maker,
+            request.start_date,
+            request.end_date,
+            request.product_ids,
+            include_forecast=request.include_forecast,
+            include_historical=request.include_historical_data,
+        )
+    )
+
+
+@app.post("/reports/pdf", response_model=ReportGenerateResponse)
+async def create_pdf_report(
+    request: ReportRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Генерирует PDF-отчёт по запрошенному периоду."""
+    # Один вызов часов на обработчик: все метки времени согласованы и
+    # сразу timezone-aware, как и колонки DateTime(timezone=True).
+    now = datetime.now(timezone.utc)
+
+    template = await _get_template(request.template_name, ReportType.PDF)
+    if template is None:
+        raise HTTPException(status_code=404, detail="Шаблон отчёта не найден")
+    _, template_path = template
+
+    context = {
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+        "generated_at": now.isoformat(),
+        "include_charts": request.include_charts,
+    }
+    await _gather_report_data(request, context)
+
+    file_name = f"report_pdf_{uuid.uuid4().hex}.pdf"
+    file_path = os.path.join(REPORTS_DIR_STR, file_name)
+
+    template_obj = get_compiled_template(template_path)
+    file_size = await generate_pdf_report(template_obj, file_path, context)
+
+    expired_at = now + REPORT_TTL
+    history = ReportHistory(
+        file_name=file_name,
+        file_path=file_path,
+        type=ReportType.PDF,
+        size_bytes=file_size,
+        # Одна сериализация Pydantic вместо ручной сборки словаря
+        # с isoformat() по полям.
+        parameters=request.model_dump(mode="json"),
+        created_at=now,
+        expired_at=expired_at,
+    )
+    db.add(history)
+    await db.commit()
+
+    logger.info("Сгенерирован PDF-отчёт %s (%d байт)", file_name, file_size)
+
+    return ReportGenerateResponse(
+        file_name=file_name,
+        type=ReportType.PDF,
+        size_bytes=file_size,
+        created_at=now,
+        expired_at=expired_at,
+        generation_time_seconds=(datetime.now(timezone.utc) - now).total_seconds(),
+    )
+
+
+@app.post("/reports/xlsx", response_model=ReportGenerateResponse)
+async def create_xlsx_report(
+    request: ReportRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Генерирует XLSX-отчёт по запрошенному периоду."""
+    # Один вызов часов на обработчик: все метки времени согласованы и
+    # сразу timezone-aware, как и колонки DateTime(timezone=True).
+    now = datetime.now(timezone.utc)
+
+    template = await _get_template(request.template_name, ReportType.XLSX)
+    if template is None:
+        raise HTTPException(status_code=404, detail="Шаблон отчёта не найден")
+    _, template_path = template
+
+    context = {
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+        "generated_at": now.isoformat(),
+        "include_pivot_tables": request.include_pivot_tables,
+    }
+    await _gather_report_data(request, context)
+
+    file_name = f"report_xlsx_{uuid.uuid4().hex}.xlsx"
+    file_path = os.path.join(REPORTS_DIR_STR, file_name)
+
+    file_size = await generate_xlsx_report(template_path, file_path, context)
+
+    expired_at = now + REPORT_TTL
+    history = ReportHistory(
+        file_name=file_name,
+        file_path=file_path,
+        type=ReportType.XLSX,
+        size_bytes=file_size,
+        # Одна сериализация Pydantic вместо ручной сборки словаря
+        # с isoformat() по полям.
+        parameters=request.model_dump(mode="json"),
+        created_at=now,
+        expired_at=expired_at,
+    )
+    db.add(history)
+    await db.commit()
+
+    logger.info("Сгенерирован XLSX-отчёт %s (%d байт)", file_name, file_size)
+
+    return ReportGenerateResponse(
+        file_name=file_name,
+        type=ReportType.XLSX,
+        size_bytes=file_size,
+        created_at=now,
+        expired_at=expired_at,
+        generation_time_seconds=(datetime.now(timezone.utc) - now).total_seconds(),
+    )
+
+
+@app.get("/reports/history", response_model=List[ReportHistoryResponse])
+async def get_report_history(
+    response: Response,
+    limit: int = Query(10, ge=1, le=200),
+    cursor: Optional[datetime] = Query(None),
+    type: Optional[ReportType] = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Возвращает историю сгенерированных отчётов.
+
+    Пагинация курсорная: следующая страница запрашивается с
+    `cursor` = значение заголовка X-Next-Cursor предыдущего ответа.
+    Индексный скан начинается с курсора, без пропуска OFFSET-строк.
+    """
+    query = _HISTORY_STMT
+    if type is not None:
+        query = query.where(ReportHistory.type == type)
+    if cursor is not None:
+        query = query.where(ReportHistory.created_at < cursor)
+    query = query.limit(limit)
+
+    result = await db.execute(query)
+    rows = result.all()
+    if rows:
+        response.headers["X-Next-Cursor"] = rows[-1].created_at.isoformat()
+    return [ReportHistoryResponse.model_validate(dict(r._mapping)) for r in rows]
+
+
+@app.get("/reports/templates", response_model=List[ReportTemplateResponse])
+async def list_report_templates(
+    type: Optional[ReportType] = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Возвращает список шаблонов отчётов."""
+    query = _TEMPLATE_LIST_STMT
+    if type is not None:
+        query = query.where(ReportTemplate.type == type)
+
+    result = await db.execute(query)
+    return [
+        ReportTemplateResponse.model_validate(dict(r._mapping)) for r in result.all()
+    ]
+
+
+@app.post("/reports/templates", response_model=ReportTemplateResponse)
+async def create_report_template(
+    template: ReportTemplateCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Регистрирует новый шаблон отчёта."""
+    # Проверка существования по id: БД возвращает один скаляр, без
+    # гидратации строки целиком (включая description). Уникальность —
+    # по паре (name, type), как и поиск шаблона при генерации.
+    exists_stmt = (
+        select(ReportTemplate.id)
+        .where(ReportTemplate.name == template.name)
+        .where(ReportTemplate.type == template.type)
+        .limit(1)
+    )
+    if await db.scalar(exists_stmt) is not None:
+        raise HTTPException(
+            status_code=400, detail="Шаблон с таким именем и типом уже существует"
+        )
+
+    row = ReportTemplate(
+        name=template.name,
+        type=template.type,
+        template_path=template.template_path,
+        description=template.description,
+    )
+    db.add(row)
+    await db.commit()
+    await db.refresh(row)
+    _get_template.cache_clear()
+    return ReportTemplateResponse.model_validate(row)
+
+
+@app.get("/reports/metrics", response_model=ReportMetricsResponse)
+async def get_report_metrics(db: AsyncSession = Depends(get_db)):
+    """Возвращает агрегированные метрики по истории отчётов.
+
+    Счёт и средний размер считаются на стороне БД, поэтому стоимость
+    запроса не зависит от размера истории.
+    """
+    total_reports = await db.scalar(
+        select(func.count()).select_from(ReportHistory)
+    )
+
+    by_type = await db.execute(
+        select(
+            ReportHistory.type,
+            func.count(),
+            func.avg(ReportHistory.size_bytes),
+        ).group_by(ReportHistory.type)
+    )
+
+    pdf_reports = 0
+    xlsx_reports = 0
+    total_size = 0.0
+    for report_type, count, avg_size in by_type.all():
+        if report_type == ReportType.PDF:
+            pdf_reports = count
+        elif report_type == ReportType.XLSX:
+            xlsx_reports = count
+        # asyncpg отдаёт avg(int) как Decimal — приводим явно.
+        total_size += float(avg_size or 0) * count
+
+    average_size = total_size / total_reports if total_reports else 0.0
+
+    popular = await db.execute(
+        select(
+            ReportHistory.parameters["template_name"].astext.label("template"),
+            func.count().label("cnt"),
+        )
+        .group_by("template")
+        .order_by(func.count().desc())
+    )
+    popular_row = popular.first()
+
+    return ReportMetricsResponse(
+        total_reports=total_reports or 0,
+        pdf_reports=pdf_reports,
+        xlsx_reports=xlsx_reports,
+        average_size_bytes=average_size,
+        popular_template=popular_row.template if popular_row else None,
+    )
+
+
+_MEDIA_TYPES = {
+    ".pdf": "application/pdf",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Имена, которые генерирует сам сервис: report_<тип>_<uuid4.hex>.<тип>.
+# Всё остальное отсекается до обращения к файловой системе.
+_NAME_RE = re.compile(r"^report_(pdf|xlsx)_[0-9a-f]{32}\.(pdf|xlsx)$")
+
+
+@app.get("/reports/download/{file_name}")
+def download_report(file_name: str):
+    """Отдаёт файл сгенерированного отчёта.
+
+    Обычная def-функция: FastAPI выполняет её в пуле потоков, не занимая
+    event loop. Один stat служит и проверкой существования, и stat_result
+    для FileResponse; под uvicorn файл уходит через sendfile без
+    копирования содержимого в Python.
+    """
+    if not _NAME_RE.match(file_name):
+        raise HTTPException(status_code=404, detail="Файл отчёта не найден")
+
+    file_path = REPORTS_DIR / file_name
+    try:
+        stat_result = file_path.stat()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Файл отчёта не найден")
+
+    return FileResponse(
+        file_path,
+        media_type=_MEDIA_TYPES.get(file_path.suffix, "application/octet-stream"),
+        filename=file_name,
+        stat_result=stat_result,
+    )
+
+
+@app.post("/reports/cleanup")
+async def cleanup_expired_reports(
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """Планирует удаление просроченных отчётов."""
+    result = await db.execute(
+        select(ReportHistory.id, ReportHistory.file_path).where(
+            ReportHistory.expired_at < datetime.now(timezone.utc)
+        )
+    )
+    expired_reports = result.all()
+
+    background_tasks.add_task(
+        cleanup_expired_report_files,
+        [r.id for r in expired_reports],
+        [r.file_path for r in expired_reports],
+    )
+
+    return {"message": f"Запланировано удаление {len(expired_reports)} отчётов"}
+
+
+async def cleanup_expired_report_files(ids: List[int], paths: List[str]):
+    """Удаляет файлы просроченных отчётов и их записи одной командой.
+
+    Принимает только id и пути: сессия запроса к моменту запуска фоновой
+    задачи уже закрыта, поэтому задача открывает собственную. Файлы
+    удаляются параллельно в пуле потоков; missing_ok избавляет от
+    предварительного stat.
+    """
+    await asyncio.gather(
+        *[asyncio.to_thread(Path(p).unlink, missing_ok=True) for p in paths],
+        return_exceptions=True,
+    )
+
+    async with async_session_maker() as db:
+        await db.execute(delete(ReportHistory).where(ReportHistory.id.in_(ids)))
+        await db.commit()
+    logger.info("Удалено %d просроченных отчётов", len(ids))
+
+
+@app.get("/health")
+def health_check():
+    """Проверка работоспособности сервиса."""
+    return {"status": "ok", "service": "report_service"}
@@ -0,0 +1,124 @@
+"""ORM-модели сервиса отчётов."""
+
+import enum
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class ReportType(str, enum.Enum):
+    """Формат отчёта."""
+
+    PDF = "pdf"
+    XLSX = "xlsx"
+
+
+report_type_enum = Enum(
+    ReportType,
+    name="reporttype",
+    values_callable=lambda e: [m.value for m in e],
+)
+
+
+class ReportTemplate(Base):
+    """Шаблон отчёта."""
+
+    __tablename__ = "report_templates"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    type = Column(report_type_enum, nullable=False)
+    template_path = Column(String(512), nullable=False)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Шаблон ищется по паре (name, type) — стандартные PDF- и
+    # XLSX-шаблоны оба называются "default".
+    __table_args__ = (UniqueConstraint("name", "type", name="uq_rt_name_type"),)
+
+
+class ReportHistory(Base):
+    """Запись о сгенерированном отчёте."""
+
+    __tablename__ = "report_history"
+
+    id = Column(Integer, primary_key=True)
+    file_name = Column(String(255), nullable=False)
+    file_path = Column(String(512), nullable=False)
+    type = Column(report_type_enum, nullable=False)
+    size_bytes = Column(Integer, nullable=True)
+    parameters = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expired_at = Column(DateTime(timezone=True), nullable=True)
+
+    # История листается по created_at DESC с фильтром по типу, а фоновая
+    # очистка ищет по expired_at — оба пути работают по индексу.
+    __table_args__ = (
+        Index("ix_rh_type_created", "type", created_at.desc()),
+        Index("ix_rh_expired", "expired_at"),
+    )
+
+
+class Product(Base):
+    """Товар."""
+
+    __tablename__ = "products"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    category = Column(String(255), nullable=True)
+
+
+class Forecast(Base):
+    """Прогноз спроса на товар на конкретную дату."""
+
+    __tablename__ = "forecasts"
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    forecasted_demand = Column(Float, nullable=False)
+    confidence_low = Column(Float, nullable=True)
+    confidence_high = Column(Float, nullable=True)
+    is_manual_override = Column(Boolean, default=False, nullable=False)
+    accuracy = Column(Float, nullable=True)
+    status = Column(String(32), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class Order(Base):
+    """Заказ."""
+
+    __tablename__ = "orders"
+
+    id = Column(Integer, primary_key=True)
+    order_date = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String(32), nullable=True)
+
+
+class OrderItem(Base):
+    """Позиция заказа."""
+
+    __tablename__ = "order_items"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
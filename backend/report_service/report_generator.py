@@ -0,0 +1,448 @@
+"""Генерация PDF/XLSX-отчётов и выборка данных для них."""
+
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import jinja2
+import orjson
+import pandas as pd
+import xlsxwriter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from weasyprint import HTML
+
+from models import Forecast, Order, OrderItem, Product
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+# WeasyPrint и xlsxwriter — чистый CPU-код под GIL: выполняем его в пуле
+# процессов, чтобы генерация отчётов не останавливала event loop и
+# масштабировалась по ядрам.
+REPORT_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# Встроенный шаблон по умолчанию — используется, когда у шаблона из БД
+# нет файла на диске.
+_DEFAULT_TEMPLATE_SRC = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="utf-8">
+    <title>Отчёт по прогнозу спроса</title>
+    <style>
+        body { font-family: sans-serif; font-size: 11px; }
+        h1 { font-size: 18px; }
+        table { border-collapse: collapse; width: 100%; margin-bottom: 16px; }
+        th, td { border: 1px solid #999; padding: 4px 6px; text-align: left; }
+        th { background: #d7e4bc; }
+    </style>
+</head>
+<body>
+    <h1>Отчёт по прогнозу спроса</h1>
+    <p>Период: {{ start_date }} — {{ end_date }}</p>
+    <p>Сформирован: {{ generated_at }}</p>
+
+    {% if forecast_data %}
+    <h2>Прогноз</h2>
+    <table>
+        <tr>
+            <th>ID продукта</th><th>Наименование</th><th>Дата</th>
+            <th>Прогноз спроса</th><th>Нижняя граница</th><th>Верхняя граница</th>
+        </tr>
+        {% for item in forecast_data %}
+        <tr>
+            <td>{{ item.product_id }}</td>
+            <td>{{ item.product_name }}</td>
+            <td>{{ item.date }}</td>
+            <td>{{ "%.2f"|format(item.forecasted_demand) }}</td>
+            <td>{{ item.confidence_low if item.confidence_low is not none else "—" }}</td>
+            <td>{{ item.confidence_high if item.confidence_high is not none else "—" }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+    {% endif %}
+
+    {% if historical_data %}
+    <h2>Фактический спрос</h2>
+    <table>
+        <tr>
+            <th>ID продукта</th><th>Наименование</th><th>Дата</th><th>Спрос</th>
+        </tr>
+        {% for item in historical_data %}
+        <tr>
+            <td>{{ item.product_id }}</td>
+            <td>{{ item.product_name }}</td>
+            <td>{{ item.date }}</td>
+            <td>{{ item.actual_demand }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+    {% endif %}
+</body>
+</html>
+"""
+
+# Окружение только для встроенного шаблона: файловые шаблоны живут в
+# templating.JINJA_ENV, загрузчик здесь не нужен.
+_JINJA_ENV = jinja2.Environment(autoescape=True)
+
+# Скомпилирован один раз при импорте — fallback-путь не ходит даже в кэш
+# загрузчика.
+_DEFAULT_TEMPLATE = _JINJA_ENV.from_string(_DEFAULT_TEMPLATE_SRC)
+
+# Спецификации форматов и заголовки листов — константы модуля. Сами
+# Format-объекты привязаны к workbook и создаются на каждый файл, но из
+# готовых словарей.
+_HEADER_FMT_SPEC = {
+    "bold": True,
+    "text_wrap": True,
+    "valign": "top",
+    "fg_color": "#D7E4BC",
+    "border": 1,
+}
+_NUMBER_FMT_SPEC = {"num_format": "#,##0.00"}
+_GREEN_FMT_SPEC = {"num_format": "#,##0.00", "bg_color": "#C6EFCE"}
+_YELLOW_FMT_SPEC = {"num_format": "#,##0.00", "bg_color": "#FFEB9C"}
+_RED_FMT_SPEC = {"num_format": "#,##0.00", "bg_color": "#FFC7CE"}
+
+_HIST_HEADERS = ("ID продукта", "Наименование продукта", "Дата", "Фактический спрос")
+_FORECAST_HEADERS = (
+    "ID продукта",
+    "Наименование продукта",
+    "Дата",
+    "Прогноз спроса",
+    "Нижняя граница",
+    "Верхняя граница",
+    "Ручная корректировка",
+    "Точность",
+    "Статус",
+)
+_PIVOT_HEADERS = ("Наименование продукта", "Месяц", "Суммарный прогноз")
+
+
+async def get_forecast_data(
+    db: AsyncSession,
+    start_date,
+    end_date,
+    product_ids=None,
+):
+    """Собирает данные прогноза за период для отчёта."""
+    # Проекция только нужных колонок: строки приходят кортежами, без
+    # гидратации ORM-объектов и identity map. Имя продукта — тем же
+    # запросом через JOIN, один round trip вместо двух: отдельного
+    # запроса products по собранному в Python множеству id (и больших
+    # IN-списков, которые плохо даются планировщику) здесь больше нет.
+    query = (
+        select(
+            Forecast.product_id,
+            Forecast.date,
+            Forecast.forecasted_demand,
+            Forecast.confidence_low,
+            Forecast.confidence_high,
+            Forecast.is_manual_override,
+            Forecast.accuracy,
+            Forecast.status,
+            Product.name,
+        )
+        .join(Product, Forecast.product_id == Product.id)
+        .where(Forecast.date.between(start_date, end_date))
+    )
+    if product_ids:
+        query = query.where(Forecast.product_id.in_(product_ids))
+
+    # Серверный курсор отдаёт строки пачками по 1000 — пиковая память не
+    # зависит от размера отчётного периода.
+    result = await db.stream(query.execution_options(yield_per=1000))
+
+    forecast_data = []
+    async for pid, date, demand, low, high, manual, accuracy, status, name in result:
+        forecast_data.append(
+            {
+                "product_id": pid,
+                "product_name": name,
+                "date": date,
+                "forecasted_demand": demand,
+                "confidence_low": low,
+                "confidence_high": high,
+                "is_manual_override": manual,
+                "accuracy": accuracy,
+                "status": status,
+            }
+        )
+    return forecast_data
+
+
+async def get_historical_data(
+    db: AsyncSession,
+    start_date,
+    end_date,
+    product_ids=None,
+):
+    """Собирает фактический спрос по заказам за период."""
+    # Суммирование по (товар, день) выполняет БД: по сети идут уже
+    # агрегированные строки, а не каждая позиция заказа.
+    day = func.date(Order.order_date).label("d")
+    query = (
+        select(
+            Product.id,
+            Product.name,
+            day,
+            func.sum(OrderItem.quantity).label("actual_demand"),
+        )
+        .join(Order, OrderItem.order_id == Order.id)
+        .join(Product, OrderItem.product_id == Product.id)
+        .where(Order.order_date.between(start_date, end_date))
+        .group_by(Product.id, Product.name, day)
+        .order_by(Product.id, day)
+    )
+    if product_ids:
+        query = query.where(OrderItem.product_id.in_(product_ids))
+
+    result = await db.stream(query.execution_options(yield_per=1000))
+
+    historical_data = []
+    async for product_id, product_name, order_date, quantity in result:
+        historical_data.append(
+            {
+                "product_id": product_id,
+                "product_name": product_name,
+                "date": order_date,
+                "actual_demand": quantity,
+            }
+        )
+    return historical_data
+
+
+async def gather_report_inputs(
+    session_factory,
+    start_date,
+    end_date,
+    product_ids=None,
+    *,
+    include_forecast: bool = True,
+    include_historical: bool = True,
+) -> dict:
+    """Параллельно выбирает данные прогноза и истории для отчёта.
+
+    Выборки независимы и идут через asyncio.gather. AsyncSession не
+    допускает конкурентных операций (IllegalStateChangeError), поэтому
+    каждая выборка получает собственную сессию из переданной фабрики.
+    Возвращает словарь с ключами forecast_data/historical_data — только
+    для запрошенных наборов.
+    """
+
+    async def _forecast():
+        async with session_factory() as db:
+            return await get_forecast_data(db, start_date, end_date, product_ids)
+
+    async def _historical():
+        async with session_factory() as db:
+            return await get_historical_data(db, start_date, end_date, product_ids)
+
+    keys = []
+    tasks = []
+    if include_forecast:
+        keys.append("forecast_data")
+        tasks.append(_forecast())
+    if include_historical:
+        keys.append("historical_data")
+        tasks.append(_historical())
+    if not tasks:
+        return {}
+    results = await asyncio.gather(*tasks)
+    return dict(zip(keys, results))
+
+
+def _render_pdf(html_content: str, base_url: str) -> bytes:
+    """Конвертирует HTML-строку в PDF; выполняется в процессе-воркере.
+
+    Функция верхнего уровня с picklable-аргументами — требование
+    ProcessPoolExecutor.
+    """
+    return HTML(string=html_content, base_url=base_url).write_pdf()
+
+
+async def generate_pdf_report(template, output_path, context) -> int:
+    """Рендерит скомпилированный Jinja-шаблон и конвертирует его в PDF.
+
+    `template` — jinja2.Template из общего окружения или None, если файла
+    шаблона нет: тогда используется встроенный шаблон по умолчанию.
+    Возвращает размер получившегося файла в байтах.
+    """
+
+    templates_dir = str(TEMPLATES_DIR)
+    if template is None:
+        template = _DEFAULT_TEMPLATE
+
+    html_content = template.render(**context)
+
+    # WeasyPrint принимает строку напрямую — без временного HTML-файла.
+    loop = asyncio.get_running_loop()
+    pdf = await loop.run_in_executor(
+        REPORT_POOL, _render_pdf, html_content, templates_dir
+    )
+
+    # Один хоп в threadpool на весь файл: для одиночной записи это
+    # быстрее aiofiles, где каждая операция — отдельный прыжок в поток.
+    await asyncio.to_thread(Path(output_path).write_bytes, pdf)
+
+    # Размер уже известен — без лишнего stat-вызова.
+    return len(pdf)
+
+
+async def generate_xlsx_report(template_path, output_path, context) -> int:
+    """Формирует XLSX-отчёт в пуле процессов.
+
+    Возвращает размер получившегося файла в байтах.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        REPORT_POOL, _build_xlsx, template_path, str(output_path), context
+    )
+
+
+# Фиксированная ширина числовых колонок: autofit в xlsxwriter обходит
+# все записанные ячейки заново, а ширины известны заранее.
+_NUM_COL_WIDTH = 12
+
+
+def _fit_width(values, header: str, cap: int = 60) -> int:
+    """Ширина текстовой колонки: максимум по данным и заголовку."""
+    width = max((len(str(v)) for v in values), default=0)
+    return min(max(width, len(header)), cap) + 2
+
+
+@functools.lru_cache(maxsize=32)
+def _load_template_config(path: str, mtime: float) -> dict:
+    """Читает JSON-конфиг XLSX-шаблона.
+
+    Кэш по (path, mtime): повторные отчёты не перечитывают и не парсят
+    файл, а правка шаблона меняет mtime и инвалидирует запись. Кэш живёт
+    в каждом процессе-воркере отдельно.
+    """
+    return orjson.loads(Path(path).read_bytes())
+
+
+def _build_xlsx(template_path, output_path, context) -> int:
+    """Собирает XLSX с листами истории, прогноза и сводной таблицей.
+
+    Выполняется в процессе-воркере.
+    """
+    template_config = {}
+    if template_path and os.path.exists(template_path):
+        template_config = _load_template_config(
+            str(template_path), os.path.getmtime(template_path)
+        )
+
+    # Исходные данные — list[dict] из get_*_data; по ним и итерируемся.
+    # DataFrame нужен только сводной таблице и строится лениво в её ветке.
+    forecast_data = context.get("forecast_data", [])
+    historical_data = context.get("historical_data", [])
+
+    # constant_memory пишет строки на диск сразу, не держа весь лист в
+    # памяти; требует записи строк по порядку — все циклы ниже так и идут.
+    workbook = xlsxwriter.Workbook(
+        str(output_path), {"constant_memory": True, "use_zip64": True}
+    )
+    # Конфиг шаблона может переопределять спецификации форматов ячеек;
+    # без секции "formats" используются стандартные.
+    fmt_overrides = template_config.get("formats", {})
+    header_format = workbook.add_format(fmt_overrides.get("header", _HEADER_FMT_SPEC))
+    number_format = workbook.add_format(fmt_overrides.get("number", _NUMBER_FMT_SPEC))
+    green_format = workbook.add_format(fmt_overrides.get("green", _GREEN_FMT_SPEC))
+    yellow_format = workbook.add_format(fmt_overrides.get("yellow", _YELLOW_FMT_SPEC))
+    red_format = workbook.add_format(fmt_overrides.get("red", _RED_FMT_SPEC))
+
+    if historical_data:
+        worksheet_hist = workbook.add_worksheet("История")
+        worksheet_hist.write_row(0, 0, _HIST_HEADERS, header_format)
+        worksheet_hist.set_column(0, 0, _NUM_COL_WIDTH)
+        worksheet_hist.set_column(
+            1, 1, _fit_width((i["product_name"] for i in historical_data), _HIST_HEADERS[1])
+        )
+        worksheet_hist.set_column(2, 3, _NUM_COL_WIDTH)
+
+        for row, item in enumerate(historical_data, start=1):
+            worksheet_hist.write_row(
+                row, 0, (item["product_id"], item["product_name"], str(item["date"]))
+            )
+            worksheet_hist.write(row, 3, item["actual_demand"], number_format)
+
+    if forecast_data:
+        worksheet_forecast = workbook.add_worksheet("Прогноз")
+        worksheet_forecast.write_row(0, 0, _FORECAST_HEADERS, header_format)
+        worksheet_forecast.set_column(0, 0, _NUM_COL_WIDTH)
+        worksheet_forecast.set_column(
+            1, 1, _fit_width((i["product_name"] for i in forecast_data), _FORECAST_HEADERS[1])
+        )
+        worksheet_forecast.set_column(2, 5, _NUM_COL_WIDTH)
+        worksheet_forecast.set_column(6, 6, len(_FORECAST_HEADERS[6]) + 2)
+        worksheet_forecast.set_column(7, 7, _NUM_COL_WIDTH)
+        worksheet_forecast.set_column(
+            8, 8, _fit_width((i["status"] or "" for i in forecast_data), _FORECAST_HEADERS[8])
+        )
+
+        # Формат ячейки прогноза разрешается одним dict.get по статусу,
+        # без цепочки сравнений на каждой строке.
+        status_fmt = {
+            "green": green_format,
+            "yellow": yellow_format,
+            "red": red_format,
+        }
+
+        # Пропуски в словарях из БД — это None, так что хватает простой
+        # проверки, без pd.isna-масок поверх DataFrame.
+        for row, item in enumerate(forecast_data, start=1):
+            status = item["status"]
+            worksheet_forecast.write_row(
+                row, 0, (item["product_id"], item["product_name"], str(item["date"]))
+            )
+            worksheet_forecast.write(
+                row, 3, item["forecasted_demand"], status_fmt.get(status, number_format)
+            )
+            low = item["confidence_low"]
+            if low is not None:
+                worksheet_forecast.write(row, 4, low, number_format)
+            high = item["confidence_high"]
+            if high is not None:
+                worksheet_forecast.write(row, 5, high, number_format)
+            worksheet_forecast.write(
+                row, 6, "Да" if item["is_manual_override"] else "Нет"
+            )
+            acc = item["accuracy"]
+            if acc is not None:
+                worksheet_forecast.write(row, 7, acc, number_format)
+            worksheet_forecast.write(row, 8, status or "")
+
+        if context.get("include_pivot_tables"):
+            # Единственный потребитель pandas: группировка по месяцам.
+            pivot_data = pd.DataFrame(forecast_data)
+            pivot_data["date"] = pd.to_datetime(pivot_data["date"])
+            pivot = (
+                pivot_data.groupby(
+                    ["product_name", pd.Grouper(key="date", freq="M")]
+                )["forecasted_demand"]
+                .sum()
+                .reset_index()
+            )
+
+            worksheet_pivot = workbook.add_worksheet("Сводная")
+            worksheet_pivot.write_row(0, 0, _PIVOT_HEADERS, header_format)
+            worksheet_pivot.set_column(
+                0, 0, _fit_width(pivot["product_name"], _PIVOT_HEADERS[0])
+            )
+            worksheet_pivot.set_column(1, 2, _NUM_COL_WIDTH)
+
+            row = 1
+            for _, item in pivot.iterrows():
+                worksheet_pivot.write(row, 0, item["product_name"])
+                worksheet_pivot.write(row, 1, item["date"].strftime("%Y-%m"))
+                worksheet_pivot.write(row, 2, item["forecasted_demand"], number_format)
+                row += 1
+
+    workbook.close()
+    return os.path.getsize(output_path)
@@ -0,0 +1,112 @@
+"""Pydantic-схемы сервиса отчётов."""
+
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from models import ReportType
+
+
+class ReportRequest(BaseModel):
+    """Параметры генерации отчёта."""
+
+    template_name: str = "default"
+    start_date: date
+    end_date: date
+    product_ids: Optional[List[int]] = None
+    include_forecast: bool = True
+    include_historical_data: bool = True
+    include_charts: bool = True
+    include_pivot_tables: bool = False
+
+
+class ReportGenerateResponse(BaseModel):
+    """Результат генерации отчёта."""
+
+    file_name: str
+    type: ReportType
+    size_bytes: int
+    created_at: datetime
+    expired_at: datetime
+    generation_time_seconds: float
+
+
+class ReportHistoryResponse(BaseModel):
+    """Запись истории отчётов."""
+
+    id: int
+    file_name: str
+    type: ReportType
+    size_bytes: Optional[int]
+    created_at: datetime
+    expired_at: Optional[datetime]
+
+    model_config = ConfigDict(
+        from_attributes=True, extra="ignore", validate_assignment=False
+    )
+
+
+class ReportTemplateCreate(BaseModel):
+    """Данные для создания шаблона отчёта."""
+
+    name: str
+    type: ReportType
+    template_path: str
+    description: Optional[str] = None
+
+
+class ReportTemplateResponse(BaseModel):
+    """Шаблон отчёта."""
+
+    id: int
+    name: str
+    type: ReportType
+    template_path: str
+    description: Optional[str]
+    created_at: datetime
+
+    model_config = ConfigDict(
+        from_attributes=True, extra="ignore", validate_assignment=False
+    )
+
+
+class ReportMetricsResponse(BaseModel):
+    """Агрегированные метрики по истории отчётов."""
+
+    total_reports: int
+    pdf_reports: int
+    xlsx_reports: int
+    average_size_bytes: float
+    popular_template: Optional[str]
+
+
+class ReportForecastDataPoint(BaseModel):
+    """Строка прогноза в отчёте."""
+
+    product_id: int
+    product_name: str
+    date: date
+    forecasted_demand: float
+    confidence_low: Optional[float] = None
+    confidence_high: Optional[float] = None
+    is_manual_override: bool = False
+    accuracy: Optional[float] = None
+    status: Optional[str] = None
+
+    model_config = ConfigDict(
+        from_attributes=True, extra="ignore", validate_assignment=False
+    )
+
+
+class ReportHistoricalDataPoint(BaseModel):
+    """Строка фактического спроса в отчёте."""
+
+    product_id: int
+    product_name: str
+    date: date
+    actual_demand: float
+
+    model_config = ConfigDict(
+        from_attributes=True, extra="ignore", validate_assignment=False
+    )
@@ -0,0 +1,31 @@
+"""Общее Jinja-окружение сервиса отчётов.
+
+Окружение создаётся один раз на процесс: скомпилированные шаблоны живут
+во внутреннем кэше Jinja и в байткод-кэше на диске, поэтому генерация
+отчёта не платит за чтение, парсинг и компиляцию шаблона.
+"""
+
+from pathlib import Path
+
+import jinja2
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+JINJA_ENV = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(str(TEMPLATES_DIR)),
+    autoescape=True,
+    auto_reload=False,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+)
+
+
+def get_compiled_template(template_path: str) -> jinja2.Template | None:
+    """Возвращает скомпилированный шаблон по пути из БД.
+
+    None, если файла шаблона нет — вызывающий код использует встроенный
+    шаблон по умолчанию.
+    """
+    try:
+        return JINJA_ENV.get_template(Path(template_path).name)
+    except jinja2.TemplateNotFound:
+        return None